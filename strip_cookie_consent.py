@@ -1,54 +1,87 @@
+import mmap
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
 
 # Directory containing your markdown files
 output_dir = "./output"
 
-# Define the phrases to look for
-start_phrase = "By selecting"
-end_phrases = ["targeted advertising", "less targeted advertising"]
+# Cookie consent block: from "By selecting" up to the first "(less) targeted advertising"
+# plus the character after it (normally the closing period). Surrounding whitespace
+# is consumed too so the text around the block is joined cleanly.
+# The pattern works on raw UTF-8 bytes, so whitespace is every character that
+# str.isspace() accepts, in its UTF-8 encoding, and the trailing character may
+# span several bytes.
+START_PHRASE = b"By selecting"
+# (U+3000 is the highest code point that is whitespace)
+_SPACE_CHARS = [chr(c).encode("utf-8") for c in range(0x3001) if chr(c).isspace()]
+_WS = (rb"(?:[" + b"".join(re.escape(c) for c in _SPACE_CHARS if len(c) == 1) + rb"]|"
+       + b"|".join(re.escape(c) for c in _SPACE_CHARS if len(c) > 1) + rb")*")
+_UTF8_CHAR = rb"(?:[\x00-\x7f]|[\xc0-\xf7][\x80-\xbf]*)"
+PATTERN = re.compile(
+    _WS + rb"By selecting.*?(?:less targeted|targeted) advertising" + _UTF8_CHAR + rb"?" + _WS,
+    re.DOTALL,
+)
 
-# Count of files processed
-processed_count = 0
-failed_count = 0
 
-# Process all markdown files in the directory
-for filename in os.listdir(output_dir):
-    if filename.endswith(".md"):
-        file_path = os.path.join(output_dir, filename)
-        
+def _strip_one(path: str) -> Tuple[str, Optional[bool]]:
+    """Strip the cookie consent block from a single markdown file.
+    
+    Returns a status message and True if the file was rewritten, False if it
+    could not be processed (including a consent block without an end), or None
+    if no cookie consent text was found.
+    """
+    filename = os.path.basename(path)
+    
+    try:
+        fd = os.open(path, os.O_RDWR)
         try:
-            # Read the file content
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            size = os.fstat(fd).st_size
+            if size == 0:
+                return f"No cookie consent text found in {filename}", None
+            
+            # Search the mapped bytes directly and shift the tail over the block in place
+            with mmap.mmap(fd, 0) as mm:
+                match = PATTERN.search(mm)
+                if match is None:
+                    if mm.find(START_PHRASE) != -1:
+                        return f"Could not find the end of the cookie consent text in {filename}", False
+                    return f"No cookie consent text found in {filename}", None
+                start, end = match.span()
+                mm.move(start, end, size - end)
+                mm.flush()
             
-            # Find the start of the cookie consent text
-            cookie_start_index = content.find(start_phrase)
-            if cookie_start_index != -1:
-                # Try to find the end of the cookie consent text
-                for phrase in end_phrases:
-                    end_index = content.find(phrase, cookie_start_index)
-                    if end_index != -1:
-                        # Calculate the full range to remove
-                        end_index += len(phrase) + 1  # +1 for the period
-                        
-                        # Create new content by removing the cookie consent block
-                        new_content = content[:cookie_start_index].rstrip() + content[end_index:].lstrip()
-                        
-                        # Write the cleaned content back to the file
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            f.write(new_content)
-                        
-                        processed_count += 1
-                        print(f"Successfully processed {filename}")
-                        break
-                else:
-                    failed_count = failed_count + 1
-                    print(f"Could not find the end of the cookie consent text in {filename}")
-            else:
-                print(f"No cookie consent text found in {filename}")
+            # Drop the now-duplicated bytes left at the end of the file
+            os.ftruncate(fd, size - (end - start))
+        finally:
+            os.close(fd)
         
-        except Exception as e:
-            failed_count = failed_count + 1
-            print(f"Error processing {filename}: {str(e)}")
+        return f"Successfully processed {filename}", True
+    
+    except Exception as e:
+        return f"Error processing {filename}: {str(e)}", False
+
+
+def main():
+    # Count of files processed
+    processed_count = 0
+    failed_count = 0
+    
+    # Process all markdown files in the directory, one worker per core
+    with os.scandir(output_dir) as entries:
+        paths = [entry.path for entry in entries if entry.name.endswith(".md")]
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for message, processed in executor.map(_strip_one, paths, chunksize=16):
+            print(message)
+            if processed:
+                processed_count += 1
+            elif processed is False:
+                failed_count = failed_count + 1
+    
+    print(f"\nSummary: Successfully processed {processed_count} files, failed to process {failed_count} files.")
+
 
-print(f"\nSummary: Successfully processed {processed_count} files, failed to process {failed_count} files.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,23 @@
 
 import asyncio
 import argparse
+import hashlib
+import shelve
 import sys
 import traceback
 import os
 import re
+from collections import defaultdict
+from functools import cache, lru_cache, partial
+from itertools import islice
 from typing import List, Optional, Tuple
 from urllib.parse import urlparse
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 from crawl4ai import (
     AsyncWebCrawler,
     CrawlerRunConfig,
@@ -27,10 +37,31 @@ from crawl4ai import (
     SeedingConfig,
 )
 from crawl4ai.async_dispatcher import MemoryAdaptiveDispatcher, SemaphoreDispatcher
+from crawl4ai.deep_crawling.filters import URLFilter
 from crawl4ai.content_filter_strategy import PruningContentFilter, BM25ContentFilter, LLMContentFilter
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 
 
+class _FilenameCharMap(dict):
+    """str.translate table that maps every character that is not a word
+    character, '-' or '.' to '_'.
+
+    Entries are computed on first lookup and cached, so any code point is
+    handled at table-lookup speed after the first time it is seen.
+    """
+
+    def __missing__(self, c):
+        char = chr(c)
+        value = char if char.isalnum() or char in '_-.' else '_'
+        self[c] = value
+        return value
+
+
+# Translation table used by get_filename_from_url
+_INVALID_FILENAME_CHARS = _FilenameCharMap()
+
+
+@lru_cache(maxsize=4096)
 def get_filename_from_url(url):
     """Extract a meaningful filename from a URL.
     
@@ -61,21 +92,286 @@ def get_filename_from_url(url):
         # If no path or empty path, use the domain name
         filename = parsed_url.netloc.split('.')[-2]  # e.g., 'example' from 'example.com'
     
-    # Clean the filename - remove any query parameters or fragments
-    filename = re.sub(r'[\?#].*$', '', filename)
+    # Clean the filename - remove any query parameters or fragments and
+    # replace characters that are not valid in a filename
+    filename = filename.partition('?')[0].partition('#')[0].translate(_INVALID_FILENAME_CHARS)
     
     # If filename is empty (e.g., for root URLs like https://example.com/), use 'index'
     if not filename:
         filename = 'index'
     
-    # Ensure the filename is valid
-    filename = re.sub(r'[^\w\-\.]', '_', filename)
-    
     return filename
 
 
-async def main():
-    # Parse command line arguments
+def canonicalize_url(url):
+    """Normalize a URL for use as a URL cache key."""
+    return urlparse(url).geturl().rstrip('/').lower()
+
+
+class CompiledURLPatternFilter(URLPatternFilter):
+    """URLPatternFilter that matches all plain glob patterns with one combined regex.
+    
+    The stock filter compiles every glob pattern separately and searches the
+    URL with each of them in turn. Here those path globs are joined into a
+    single alternation, while suffix, prefix, domain and regex patterns keep
+    the stock handling.
+    
+    This relies on URLPatternFilter internals (_add_pattern, _path_patterns,
+    PATTERN_TYPES) as of crawl4ai 0.9.4. If they are missing, patterns are
+    left uncombined and the stock matching is used as is.
+    """
+
+    _PATH_TYPE = getattr(URLPatternFilter, "PATTERN_TYPES", {}).get("PATH")
+
+    def __init__(self, patterns, use_glob=True, reverse=False):
+        self._glob_patterns = []
+        super().__init__(patterns=patterns, use_glob=use_glob, reverse=reverse)
+        if len(self._glob_patterns) > 1:
+            self._path_patterns.append(re.compile("|".join(p.pattern for p in self._glob_patterns)))
+        else:
+            self._path_patterns.extend(self._glob_patterns)
+
+    def _add_pattern(self, pattern, pattern_type):
+        super()._add_pattern(pattern, pattern_type)
+        # Pull the glob translated by the stock logic back out so it can be combined
+        if (self._PATH_TYPE is not None and pattern_type == self._PATH_TYPE
+                and isinstance(pattern, str) and getattr(self, "_path_patterns", None)):
+            self._glob_patterns.append(self._path_patterns.pop())
+
+
+def is_cached_url(url_cache, url):
+    """Return True if the URL cache holds an entry for the URL whose saved file still exists."""
+    entry = url_cache.get(canonicalize_url(url))
+    return entry is not None and os.path.exists(entry["path"])
+
+
+class CachedURLFilter(URLFilter):
+    """Reject URLs whose saved markdown from a previous run is still on disk.
+    
+    Rejected pages are not fetched, so links on them are not followed either.
+    """
+
+    def __init__(self, url_cache):
+        super().__init__()
+        self.url_cache = url_cache
+
+    def apply(self, url: str) -> bool:
+        passed = not is_cached_url(self.url_cache, url)
+        self._update_stats(passed)
+        return passed
+
+
+# Number of concurrent markdown save workers in streaming mode and the
+# maximum number of results waiting to be saved
+SAVE_WORKERS = 4
+SAVE_QUEUE_SIZE = 64
+
+# Number of streamed results whose progress lines are written to stderr at once
+PROGRESS_FLUSH_INTERVAL = 50
+
+
+def _write_file_parts(path, parts):
+    """Write byte strings to a file, using a single writev() call where available."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        written = os.writev(fd, parts) if hasattr(os, 'writev') else 0
+        
+        # Finish any short (or unsupported) writev part by part
+        for part in parts:
+            if written >= len(part):
+                written -= len(part)
+                continue
+            view = memoryview(part)[written:]
+            written = 0
+            while view:
+                view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _write_compressed_parts(path, parts):
+    """Write byte strings to a file as a single zstd frame."""
+    cctx = zstandard.ZstdCompressor(level=3)
+    with open(path, 'wb') as f:
+        with cctx.stream_writer(f, size=sum(len(part) for part in parts)) as writer:
+            for part in parts:
+                writer.write(part)
+
+
+async def write_markdown_file(md_path, header, body, compress=False):
+    """Write an encoded markdown header and body to disk without blocking the event loop.
+    
+    Both parts go out in one writev() call from a worker thread, so the body
+    is never copied into a combined buffer. With compress=True they are
+    streamed through a zstd compressor instead.
+    """
+    write_parts = _write_compressed_parts if compress else _write_file_parts
+    await asyncio.to_thread(write_parts, md_path, (header, body))
+
+
+def _strip_markdown_ext(name):
+    """Return a saved markdown filename without its extension, or None for other files."""
+    for ext in (".md.zst", ".md"):
+        if name.endswith(ext):
+            return name[:-len(ext)]
+    return None
+
+
+def load_used_filenames(output_dir, url_cache=None):
+    """Map the markdown filenames already in the output directory to their owners.
+    
+    Keys are filenames without extension; values are the canonicalized URL
+    saved in that file according to the URL cache, or None if unknown.
+    """
+    used_filenames = {}
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            filename = _strip_markdown_ext(entry.name)
+            if filename is not None:
+                used_filenames[filename] = None
+    
+    if url_cache is not None:
+        for url_key, cache_entry in url_cache.items():
+            filename = _strip_markdown_ext(os.path.basename(cache_entry["path"]))
+            if filename in used_filenames:
+                used_filenames[filename] = url_key
+    
+    return used_filenames
+
+
+async def save_result_markdown(result, args, url_cache=None, used_filenames=None):
+    """Save the markdown of a crawl result to the output directory.
+    
+    Returns True if a file was written; results without any markdown body
+    are skipped. When a URL cache is given, the saved file is recorded in it
+    under the canonicalized URL. When a mapping of already-used filenames to
+    their URLs is given (see load_used_filenames), a filename used for a
+    different URL gets a short hash suffix of the URL instead of overwriting
+    the earlier file.
+    """
+    markdown = getattr(result, 'markdown', None)
+    if not (result.success and markdown):
+        return False
+    
+    # If content filter is used, only save fit_markdown
+    fit_markdown = getattr(markdown, 'fit_markdown', None) if args.content_filter else None
+    if fit_markdown is not None:
+        body = fit_markdown
+        label = "filtered markdown"
+    else:
+        body = markdown.raw_markdown
+        label = "markdown"
+    
+    # Don't write header-only files for pages without markdown
+    if not body:
+        return False
+    
+    # Get a meaningful filename from the URL
+    filename = get_filename_from_url(result.url)
+    if used_filenames is not None:
+        url_key = canonicalize_url(result.url)
+        if used_filenames.get(filename, url_key) != url_key:
+            filename = f"{filename}_{hashlib.blake2b(result.url.encode('utf-8'), digest_size=4).hexdigest()}"
+        used_filenames[filename] = url_key
+    md_name = f"{filename}.md.zst" if args.compress else f"{filename}.md"
+    md_path = os.path.join(args.output_dir, md_name)
+    
+    # Encode once; the same bytes are written and hashed for the URL cache
+    header = f"# {result.url}\n\n".encode('utf-8')
+    body = body.encode('utf-8')
+    await write_markdown_file(md_path, header, body, compress=args.compress)
+    
+    if url_cache is not None:
+        digest = hashlib.blake2b(header, digest_size=16)
+        digest.update(body)
+        url_cache[canonicalize_url(result.url)] = {
+            "sha": digest.hexdigest(),
+            "path": md_path,
+        }
+    
+    print(f"  → Saved {label} for {result.url} as {md_name}")
+    return True
+
+
+async def _save_worker(queue, args, url_cache=None, used_filenames=None):
+    """Save markdown for queued crawl results until a None sentinel arrives.
+    
+    Returns the number of markdown files written.
+    """
+    saved = 0
+    while True:
+        result = await queue.get()
+        if result is None:
+            return saved
+        try:
+            if await save_result_markdown(result, args, url_cache, used_filenames):
+                saved += 1
+        except Exception as e:
+            print(f"  → Failed to save markdown for {result.url}: {type(e).__name__}: {e}")
+
+
+class _SharedMonitor:
+    """CrawlerMonitor proxy whose start() and stop() do nothing.
+    
+    Dispatchers start and stop their monitor on every run, but the crawl runs
+    one dispatcher per batch. The caller starts and stops the real monitor
+    once around the whole crawl instead.
+    """
+
+    def __init__(self, monitor):
+        self._monitor = monitor
+
+    def __getattr__(self, name):
+        return getattr(self._monitor, name)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class _DispatcherBoundCrawler:
+    """Crawler proxy that gives arun_many calls a fresh dispatcher from a factory."""
+
+    def __init__(self, crawler, dispatcher_factory):
+        self._crawler = crawler
+        self._dispatcher_factory = dispatcher_factory
+
+    def __getattr__(self, name):
+        return getattr(self._crawler, name)
+
+    async def arun_many(self, urls, config=None, dispatcher=None, **kwargs):
+        return await self._crawler.arun_many(
+            urls, config=config, dispatcher=dispatcher or self._dispatcher_factory(), **kwargs
+        )
+
+
+class DispatcherBFSDeepCrawlStrategy(BFSDeepCrawlStrategy):
+    """BFSDeepCrawlStrategy that runs its per-level batches through configured dispatchers.
+    
+    The stock strategy calls crawler.arun_many() without a dispatcher, so the
+    dispatcher passed to crawler.arun() is ignored and a default
+    MemoryAdaptiveDispatcher is created for every level instead. Here every
+    level gets a dispatcher from dispatcher_factory. Dispatchers keep per-run
+    state, so one instance must not serve nested or concurrent runs (e.g.
+    several seeded URLs deep-crawled at once); shared settings such as the
+    rate limiter belong in the factory.
+    """
+
+    def __init__(self, *args, dispatcher_factory=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dispatcher_factory = dispatcher_factory
+
+    async def arun(self, start_url, crawler, config=None):
+        if self.dispatcher_factory is not None:
+            crawler = _DispatcherBoundCrawler(crawler, self.dispatcher_factory)
+        return await super().arun(start_url, crawler, config)
+
+
+@cache
+def _build_parser():
+    """Build the command line parser (constructed once and reused)."""
     parser = argparse.ArgumentParser(description="Crawl4AI Deep Crawler Application")
     parser.add_argument("url", type=str, help="Starting URL for the crawl")
     parser.add_argument("--max-depth", type=int, default=2, help="Maximum depth to crawl (default: 2)")
@@ -166,6 +462,10 @@ async def main():
                         help="Save markdown content for each URL")
     parser.add_argument("--output-dir", type=str, default="./output", 
                         help="Directory to save markdown files (default: ./output)")
+    parser.add_argument("--compress", action="store_true",
+                        help="Save markdown files zstd-compressed as .md.zst (requires the zstandard package)")
+    parser.add_argument("--force-rescrape", action="store_true",
+                        help="Crawl URLs again even if they are already in the output directory's URL cache")
     
     # Rate limiter parameters
     parser.add_argument("--enable-rate-limiter", action="store_true",
@@ -199,14 +499,39 @@ async def main():
     parser.add_argument("--cache-mode", type=str, choices=["enabled", "bypass", "refresh"], default="bypass",
                         help="Cache mode for requests (default: bypass)")
     
-    args = parser.parse_args()
+    return parser
+
+
+async def crawl(args):
+    """Run a crawl for already-parsed arguments.
+    
+    Accepts any argparse.Namespace produced by the command line parser, so
+    driver scripts can reuse one parser across many runs.
+    """
+    if args.compress and zstandard is None:
+        print("ERROR: --compress requires the zstandard package (pip install zstandard)")
+        return
     
+    url_cache = None
+    used_filenames = None
+    monitor = None
     try:
+        # Create output directory if saving markdown and it doesn't exist
+        if args.save_markdown:
+            os.makedirs(args.output_dir, exist_ok=True)
+        
+        # Open the URL cache of pages saved by previous runs
+        if args.save_markdown:
+            url_cache = shelve.open(os.path.join(args.output_dir, ".url_cache"))
+            
+            # Reserve the filenames of markdown already saved in the output directory
+            used_filenames = load_used_filenames(args.output_dir, url_cache)
+        
         # Build filters if specified
         filters = []
         
         if args.url_patterns:
-            filters.append(URLPatternFilter(patterns=args.url_patterns))
+            filters.append(CompiledURLPatternFilter(patterns=args.url_patterns))
         
         if args.allowed_domains or args.blocked_domains:
             filters.append(DomainFilter(
@@ -224,21 +549,17 @@ async def main():
         if allowed_content_types:
             filters.append(ContentTypeFilter(allowed_types=allowed_content_types))
         
+        # Skip URLs saved by previous runs unless a rescrape is forced
+        if url_cache is not None:
+            if args.force_rescrape:
+                print("Forcing rescrape of URLs already in the URL cache")
+            else:
+                filters.append(CachedURLFilter(url_cache))
+        
         # Create filter chain - ALWAYS create a filter chain even if empty
         # This prevents the 'NoneType' has no attribute 'apply' error
         filter_chain = FilterChain(filters=filters)
         
-        # Create the deep crawl strategy
-        strategy = BFSDeepCrawlStrategy(
-            max_depth=args.max_depth,
-            include_external=args.include_external,
-            filter_chain=filter_chain  # Always provide a filter chain
-        )
-        
-        # Set max_pages separately if specified
-        if args.max_pages is not None:
-            strategy.max_pages = args.max_pages
-        
         # Create markdown generator options dictionary
         markdown_options = {}
         if args.ignore_links:
@@ -340,6 +661,10 @@ async def main():
                 # Extract URLs from seeder results
                 discovered_urls = [result.url for result in seeded_results if hasattr(result, 'url')]
                 
+                # Drop seeded URLs already saved by previous runs
+                if url_cache is not None and not args.force_rescrape:
+                    discovered_urls = [url for url in discovered_urls if not is_cached_url(url_cache, url)]
+                
                 if discovered_urls:
                     urls_to_crawl = discovered_urls
                     print(f"Discovered {len(discovered_urls)} URLs via seeder")
@@ -367,15 +692,34 @@ async def main():
             )
             print(f"\nVirtual scroll enabled: {args.max_scrolls} scrolls of {args.scroll_amount}px each")
         
-        # Configure the crawler
-        config = CrawlerRunConfig(
-            deep_crawl_strategy=strategy,
-            verbose=args.verbose,
-            markdown_generator=md_generator if args.save_markdown else None,
-            stream=args.stream,
-            cache_mode=getattr(CacheMode, args.cache_mode.upper()),
-            virtual_scroll_config=virtual_scroll_config
-        )
+        # Single-page crawl: fetch the URL directly, without a deep crawl
+        # strategy or dispatcher. Streaming, monitoring and rate limiting all
+        # need the dispatcher, so those runs take the regular path.
+        if (args.max_depth == 0 and args.max_pages is None and len(urls_to_crawl) == 1
+                and not (args.stream or args.enable_monitor or args.enable_rate_limiter)):
+            config = CrawlerRunConfig(
+                verbose=args.verbose,
+                markdown_generator=md_generator if args.save_markdown else None,
+                cache_mode=getattr(CacheMode, args.cache_mode.upper()),
+                virtual_scroll_config=virtual_scroll_config
+            )
+            async with AsyncWebCrawler() as crawler:
+                result = await crawler.arun(urls_to_crawl[0], config=config)
+            
+            # Display results
+            print("\n===== CRAWL RESULTS =====\n")
+            print("Total pages crawled: 1")
+            print("\nDepth 0: 1 pages")
+            print(f"  → {result.url}")
+            
+            # Save markdown content if requested
+            if args.save_markdown:
+                print("\n===== SAVING MARKDOWN CONTENT =====\n")
+                if await save_result_markdown(result, args, url_cache, used_filenames):
+                    print(f"\nMarkdown files saved to: {os.path.abspath(args.output_dir)}")
+                else:
+                    print("\nNo markdown content was generated for any of the crawled pages.")
+            return
         
         # Create rate limiter if enabled
         rate_limiter = None
@@ -388,31 +732,61 @@ async def main():
             print(f"Rate limiter enabled with base_delay={tuple(args.base_delay)}, "
                   f"max_delay={args.max_delay}, max_retries={args.max_retries}")
         
-        # Create monitor if enabled
-        monitor = None
+        # Create monitor if enabled. It is started once here and stopped when
+        # the crawl ends; dispatchers only report to it
         if args.enable_monitor:
             monitor = CrawlerMonitor()
+            monitor.start()
             print(f"Monitor enabled")
+        dispatcher_monitor = _SharedMonitor(monitor) if monitor is not None else None
         
-        # Create dispatcher based on user selection
-        dispatcher = None
+        # Create dispatcher factory based on user selection. Dispatchers keep
+        # per-run state, so every batch gets its own instance; they all share
+        # the rate limiter and monitor
         if args.dispatcher == "memory":
-            dispatcher = MemoryAdaptiveDispatcher(
+            make_dispatcher = partial(
+                MemoryAdaptiveDispatcher,
                 memory_threshold_percent=args.memory_threshold,
                 check_interval=args.check_interval,
                 max_session_permit=args.max_concurrent,
                 rate_limiter=rate_limiter,
-                monitor=monitor
+                monitor=dispatcher_monitor
             )
             print(f"Using MemoryAdaptiveDispatcher with memory_threshold={args.memory_threshold}%, "
                   f"max_concurrent={args.max_concurrent}")
         else:  # semaphore
-            dispatcher = SemaphoreDispatcher(
+            make_dispatcher = partial(
+                SemaphoreDispatcher,
                 max_session_permit=args.max_concurrent,
                 rate_limiter=rate_limiter,
-                monitor=monitor
+                monitor=dispatcher_monitor
             )
             print(f"Using SemaphoreDispatcher with max_concurrent={args.max_concurrent}")
+        dispatcher = make_dispatcher()
+        
+        # Create the deep crawl strategy so its internal batches honor the
+        # configured concurrency and rate limits
+        strategy = DispatcherBFSDeepCrawlStrategy(
+            max_depth=args.max_depth,
+            include_external=args.include_external,
+            filter_chain=filter_chain,  # Always provide a filter chain
+            dispatcher_factory=make_dispatcher
+        )
+        
+        # Set max_pages separately if specified
+        if args.max_pages is not None:
+            strategy.max_pages = args.max_pages
+        
+        # Configure the crawler
+        config = CrawlerRunConfig(
+            deep_crawl_strategy=strategy,
+            verbose=args.verbose,
+            markdown_generator=md_generator if args.save_markdown else None,
+            stream=args.stream,
+            cache_mode=getattr(CacheMode, args.cache_mode.upper()),
+            virtual_scroll_config=virtual_scroll_config,
+            semaphore_count=args.max_concurrent
+        )
         
         # Run the crawler
         async with AsyncWebCrawler() as crawler:
@@ -421,58 +795,51 @@ async def main():
                 print("\n===== STREAMING MODE ENABLED =====\n")
                 print("Processing results as they become available...\n")
                 
-                # Create output directory if saving markdown and it doesn't exist
-                if args.save_markdown:
-                    os.makedirs(args.output_dir, exist_ok=True)
-                
                 # Initialize counters
                 total_pages = 0
-                markdown_count = 0
-                pages_by_depth = {}
+                pages_by_depth = defaultdict(list)
+                progress_buf = []
                 
-                # Process results as they arrive
-                # Use first URL from discovered URLs or fallback to original
-                crawl_url = urls_to_crawl[0] if urls_to_crawl else args.url
-                async for result in await crawler.arun(crawl_url, config=config, dispatcher=dispatcher):
-                    total_pages += 1
-                    
-                    # Update depth statistics
-                    depth = result.metadata.get("depth", 0)
-                    if depth not in pages_by_depth:
-                        pages_by_depth[depth] = []
-                    pages_by_depth[depth].append(result.url)
-                    
-                    # Display progress
-                    print(f"Processed page {total_pages}: {result.url} (depth {depth})")
-                    
-                    # Save markdown if requested
-                    if args.save_markdown and result.success and hasattr(result, 'markdown') and result.markdown:
-                        # Get a meaningful filename from the URL
-                        filename = get_filename_from_url(result.url)
+                # Save markdown in background workers fed through a bounded queue,
+                # so slow disk writes do not hold up the crawl
+                save_queue = asyncio.Queue(maxsize=SAVE_QUEUE_SIZE)
+                save_workers = []
+                if args.save_markdown:
+                    save_workers = [
+                        asyncio.create_task(_save_worker(save_queue, args, url_cache, used_filenames))
+                        for _ in range(SAVE_WORKERS)
+                    ]
+                
+                try:
+                    # Process results as they arrive
+                    # Use first URL from discovered URLs or fallback to original
+                    crawl_url = urls_to_crawl[0] if urls_to_crawl else args.url
+                    async for result in await crawler.arun(crawl_url, config=config, dispatcher=dispatcher):
+                        total_pages += 1
+                        
+                        # Update depth statistics
+                        depth = result.metadata.get("depth", 0)
+                        pages_by_depth[depth].append(result.url)
                         
-                        # If content filter is used, only save fit_markdown
-                        if args.content_filter and hasattr(result.markdown, 'fit_markdown'):
-                            # Get markdown content
-                            md_content = f"# {result.url}\n\n{result.markdown.fit_markdown or ''}"
-                            
-                            # Save filtered markdown
-                            md_path = os.path.join(args.output_dir, f"{filename}.md")
-                            with open(md_path, 'w', encoding='utf-8') as f:
-                                f.write(md_content)
-                            
-                            print(f"  → Saved filtered markdown for {result.url} as {filename}.md")
-                        else:
-                            # Get markdown content
-                            md_content = f"# {result.url}\n\n{result.markdown.raw_markdown or ''}"
-                            
-                            # Save raw markdown
-                            raw_md_path = os.path.join(args.output_dir, f"{filename}.md")
-                            with open(raw_md_path, 'w', encoding='utf-8') as f:
-                                f.write(md_content)
-                            
-                            print(f"  → Saved markdown for {result.url} as {filename}.md")
+                        # Display progress in batches to keep per-page writes off the loop
+                        progress_buf.append(f"Processed page {total_pages}: {result.url} (depth {depth})\n")
+                        if total_pages % PROGRESS_FLUSH_INTERVAL == 0:
+                            sys.stderr.write("".join(progress_buf))
+                            progress_buf.clear()
                         
-                        markdown_count += 1
+                        # Queue markdown for saving if requested
+                        if save_workers:
+                            await save_queue.put(result)
+                finally:
+                    # Flush any remaining progress lines
+                    if progress_buf:
+                        sys.stderr.write("".join(progress_buf))
+                        progress_buf.clear()
+                    
+                    # Let the workers drain the queue and stop
+                    for _ in save_workers:
+                        await save_queue.put(None)
+                    markdown_count = sum(await asyncio.gather(*save_workers))
                 
                 # Display final results
                 print(f"\n===== CRAWL RESULTS =====\n")
@@ -482,7 +849,7 @@ async def main():
                 for depth, urls in sorted(pages_by_depth.items()):
                     print(f"\nDepth {depth}: {len(urls)} pages")
                     # Show first 5 URLs for each depth as examples
-                    for url in urls[:5]:
+                    for url in islice(urls, 5):
                         print(f"  → {url}")
                     if len(urls) > 5:
                         print(f"  ... and {len(urls) - 5} more")
@@ -507,56 +874,26 @@ async def main():
                 print(f"Total pages crawled: {len(results)}")
                 
                 # Group results by depth
-                pages_by_depth = {}
+                pages_by_depth = defaultdict(list)
                 for result in results:
                     depth = result.metadata.get("depth", 0)
-                    if depth not in pages_by_depth:
-                        pages_by_depth[depth] = []
                     pages_by_depth[depth].append(result.url)
                 
                 # Display crawl structure by depth
                 for depth, urls in sorted(pages_by_depth.items()):
                     print(f"\nDepth {depth}: {len(urls)} pages")
                     # Show first 5 URLs for each depth as examples
-                    for url in urls[:5]:
+                    for url in islice(urls, 5):
                         print(f"  → {url}")
                     if len(urls) > 5:
                         print(f"  ... and {len(urls) - 5} more")
                 
                 # Save markdown content if requested
                 if args.save_markdown:
-                    # Create output directory if it doesn't exist
-                    os.makedirs(args.output_dir, exist_ok=True)
-                    
                     print(f"\n===== SAVING MARKDOWN CONTENT =====\n")
                     markdown_count = 0
-                    for i, result in enumerate(results):
-                        if result.success and hasattr(result, 'markdown') and result.markdown:
-                            # Get a meaningful filename from the URL
-                            filename = get_filename_from_url(result.url)
-                            
-                            # If content filter is used, only save fit_markdown
-                            if args.content_filter and hasattr(result.markdown, 'fit_markdown'):
-                                # Get markdown content
-                                md_content = f"# {result.url}\n\n{result.markdown.fit_markdown or ''}"
-                                
-                                # Save only fit markdown
-                                md_path = os.path.join(args.output_dir, f"{filename}.md")
-                                with open(md_path, 'w', encoding='utf-8') as f:
-                                    f.write(md_content)
-                                
-                                print(f"  → Saved filtered markdown for {result.url} as {filename}.md")
-                            else:
-                                # Get markdown content
-                                md_content = f"# {result.url}\n\n{result.markdown.raw_markdown or ''}"
-                                
-                                # Save raw markdown
-                                raw_md_path = os.path.join(args.output_dir, f"{filename}.md")
-                                with open(raw_md_path, 'w', encoding='utf-8') as f:
-                                    f.write(md_content)
-                                
-                                print(f"  → Saved markdown for {result.url} as {filename}.md")
-                            
+                    for result in results:
+                        if await save_result_markdown(result, args, url_cache, used_filenames):
                             markdown_count += 1
                     
                     if markdown_count > 0:
@@ -568,7 +905,26 @@ async def main():
         print(f"\nERROR: {type(e).__name__}: {e}")
         print("\nTraceback:")
         traceback.print_exc(file=sys.stdout)
+    finally:
+        if monitor is not None:
+            monitor.stop()
+        if url_cache is not None:
+            url_cache.close()
+
+
+async def main():
+    await crawl(_build_parser().parse_args())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Use the faster libuv-based event loop when uvloop is installed
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        if hasattr(uvloop, "run"):
+            uvloop.run(main())
+        else:  # uvloop < 0.18
+            uvloop.install()
+            asyncio.run(main())